@@ -47,6 +47,7 @@ class GroupSyncWrite:
 
             self.param.append(dxl_id)
             self.param.extend(self.data_dict[dxl_id])
+        self.is_param_changed = False
 
     def addParam(self, dxl_id, data):
         if dxl_id in self.data_dict:  # dxl_id already exist
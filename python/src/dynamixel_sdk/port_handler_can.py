@@ -17,7 +17,12 @@
 # limitations under the License.
 ################################################################################
 
+import os
 import time
+import queue
+import atexit
+import select
+import threading
 import serial
 import sys
 import platform
@@ -29,6 +34,62 @@ DEFAULT_BAUDRATE = 1000000
 DEFAULT_CAN_ID = 0x60  # Default CAN ID (standard frame, ID 0x60)
 CAN_MAX_DATA_SIZE = 8  # Maximum data size for a CAN frame
 CAN_EXTENDED_ID = 0x80000000  # Bit to set for extended frame format
+RX_POOL_SIZE = 4096  # Size of the preallocated receive buffer (maximum bytes drained per read)
+LATENCY_TIMER_PATH = '/sys/bus/usb-serial/devices/%s/latency_timer'  # Linux sysfs attribute of USB serial adapters
+
+
+def _hex(data):
+    # Format a packet as space separated upper-case hex in a single C-level pass
+    return bytes(data).hex(' ').upper()
+
+
+# Debug records (formatter, label, data) printed by a background thread so that
+# writing to the terminal never delays the serial IO path
+_debug_queue = queue.SimpleQueue()
+_debug_thread = None
+
+
+def _debug_printer():
+    while True:
+        record = _debug_queue.get()
+        if record is None:
+            return
+        fmt, label, data = record
+        # One write per line so records do not split around the caller's output
+        sys.stdout.write(f"[DEBUG] {label}: {fmt(data)}\n")
+
+
+def _stop_debug_printer():
+    # Let the printer drain the queue before the interpreter exits
+    _debug_queue.put(None)
+    _debug_thread.join(1.0)
+
+
+def _start_debug_printer():
+    global _debug_thread
+    if _debug_thread is None:
+        _debug_thread = threading.Thread(target=_debug_printer, name='PortHandlerCAN-debug', daemon=True)
+        _debug_thread.start()
+        atexit.register(_stop_debug_printer)
+
+
+# Arguments: CAN baudrate, serial baudrate, CAN ID, frame type
+_INSTR_TEMPLATE = """=== WS-TTL-CAN Configuration Instructions ===
+1. Download and open WS-CAN-TOOL software from Waveshare's website
+2. Connect the WS-TTL-CAN converter to your computer via USB-to-TTL converter
+3. Configure the following settings:
+   - Set 'Working Mode' to 'Transparent Conversion'
+   - Set 'CAN Baudrate' to %d bps
+   - Set 'Serial Baudrate' to %d bps
+   - Set 'Serial Data Bit' to 8
+   - Set 'Serial Stop Bit' to 1
+   - Set 'Serial Parity Bit' to None
+   - Set 'CAN ID' to 0x%X
+   - Set 'Frame Type' to %s
+4. Click 'Save Device Parameters'
+5. Click 'Restart Device'
+==========================================="""
+
 
 class PortHandlerCAN(PortHandler):
     """
@@ -46,6 +107,10 @@ class PortHandlerCAN(PortHandler):
     Note: Before using this port handler, you must configure the 
     WS-TTL-CAN converter using the WS-CAN-TOOL software.
     """
+    # Set once any instance enables debug output, so IO calls can skip the
+    # per-instance check while debugging is off everywhere
+    DEBUG_ANY = False
+
     def __init__(self, port_name, can_id=DEFAULT_CAN_ID, extended_id=False, can_baudrate=1000000):
         """
         Initialize the PortHandlerCAN.
@@ -56,14 +121,24 @@ class PortHandlerCAN(PortHandler):
             extended_id (bool): Use extended frame format if True
             can_baudrate (int): CAN bus baudrate (must match converter setting)
         """
-        super(PortHandlerCAN, self).__init__(port_name)
+        super().__init__(port_name)
         self.can_id = can_id
         self.extended_id = extended_id
         self.can_baudrate = can_baudrate
-        # Buffer for storing partially received packets
-        self._recv_buffer = bytearray()
+        # Preallocated receive buffer; bytes drained from the serial port but not
+        # yet consumed are held in _rx_pool[_rx_head:_rx_tail]
+        self._rx_pool = bytearray(RX_POOL_SIZE)
+        self._rx_view = memoryview(self._rx_pool)
+        self._rx_head = 0
+        self._rx_tail = 0
+        # Raw file descriptor of the open port for direct reads (None on Windows)
+        self._fd = None
         # Debug mode flag
         self.debug = False
+        # Packet formatter bound by setDebug (None while debug output is off)
+        self._fmt = None
+        # The adapter latency timer is checked once, on the first successful open
+        self._latency_timer_checked = False
         
     def writePort(self, packet):
         """
@@ -72,26 +147,32 @@ class PortHandlerCAN(PortHandler):
         In transparency mode, the WS-TTL-CAN converter will take this data
         and send it as the payload of a CAN frame with the configured ID.
         
-        For packets larger than CAN_MAX_DATA_SIZE bytes, the data is sent
-        in multiple CAN frames as required by the transparency mode.
+        The whole instruction packet is handed to the serial port in a single
+        write, never byte by byte. For packets larger than CAN_MAX_DATA_SIZE
+        bytes the converter then splits it into as few CAN frames as possible
+        (ceil(length / CAN_MAX_DATA_SIZE)), as required by the transparency mode.
         
         Args:
-            packet (bytes or list): Data packet to write
+            packet (bytes, bytearray, memoryview or list): Data packet to write.
+                Passing bytes is the zero-copy fast path: it is handed to the
+                serial port as is. pyserial copies bytearray and memoryview
+                packets on every write, and a list is converted to bytes first.
             
         Returns:
             int: Number of bytes written
         """
-        # Convert to bytearray if it's a list
-        if isinstance(packet, list):
-            packet = bytearray(packet)
+        # Only lists need to be materialized; bytes-like packets pass through
+        if packet.__class__ is list:
+            packet = bytes(packet)
         
         # In transparency mode, the WS-TTL-CAN converter should handle the 
         # packing of data into CAN frames automatically
-        if self.debug:
-            print(f"[DEBUG] Writing packet: {' '.join([f'{b:02X}' for b in packet])}")
+        if __debug__ and PortHandlerCAN.DEBUG_ANY and self._fmt is not None:
+            # Snapshot mutable buffers, the packet is formatted later by the printer thread
+            _debug_queue.put_nowait((self._fmt, 'Writing packet', packet if packet.__class__ is bytes else bytes(packet)))
         
         # Send the packet directly - in transparency mode the converter handles the rest
-        return super(PortHandlerCAN, self).writePort(packet)
+        return PortHandler.writePort(self, packet)
 
     def readPort(self, length):
         """
@@ -100,22 +181,91 @@ class PortHandlerCAN(PortHandler):
         In transparency mode, the WS-TTL-CAN converter receives CAN frames
         and extracts the payload data, which is then read as regular serial data.
         
+        Everything the serial port has buffered is drained in a single read
+        straight into a preallocated buffer, so the following calls for the
+        rest of a status packet are served without touching the OS. On POSIX
+        the read goes to the file descriptor with os.readv, bypassing
+        pyserial's per-call timeout handling. pyserial configures the tty with
+        VMIN = VTIME = 0, so that read returns at once; when it returns nothing,
+        select waits for the first bytes for at most the rest of the packet
+        timeout, so the caller's receive loop does not spin. A descriptor that
+        is readable but returns no data (adapter hung up or unplugged) is
+        dropped, and pyserial's read reports the error from then on.
+        
         Args:
-            length (int): Number of bytes to read
+            length (int): Maximum number of bytes to read
             
         Returns:
-            bytes or list: Data read from the port
+            bytes: Data read from the port (at most length bytes)
         """
-        data = super(PortHandlerCAN, self).readPort(length)
+        ser = self.ser
+        view = self._rx_view
+        head = self._rx_head
+        tail = self._rx_tail
+        if tail - head < length:
+            # Move the unread bytes to the front so the read gets the rest of the pool
+            if head:
+                view[:tail - head] = view[head:tail]
+                tail -= head
+                head = 0
+            fd = self._fd
+            if fd is not None:
+                try:
+                    ready = False
+                    while True:
+                        # Drain everything already waiting with a single syscall. pyserial
+                        # sets VMIN = VTIME = 0, so an empty port reads 0 bytes instead of
+                        # raising BlockingIOError
+                        received = os.readv(fd, (view[tail:],))
+                        if received:
+                            tail += received
+                            break
+                        if ready:
+                            # Readable but no data: the device hung up or was unplugged.
+                            # Fall back to pyserial, which raises SerialException for it
+                            self._fd = fd = None
+                            break
+                        # Nothing waiting yet, sleep until data arrives or the packet times out
+                        remaining = (self.packet_timeout - self.getTimeSinceStart()) / 1000.0
+                        if remaining <= 0:
+                            break
+                        ready = bool(select.select((fd,), (), (), remaining)[0])
+                        if not ready:
+                            break
+                except OSError:
+                    # Let pyserial deal with (and report) anything unusual from now on
+                    self._fd = fd = None
+            if fd is None:
+                # Drain everything already waiting instead of just the bytes asked for
+                chunk = min(max(length - tail, ser.in_waiting), RX_POOL_SIZE - tail)
+                tail += ser.readinto(view[tail:tail + chunk])
+
+        end = min(head + length, tail)
+        data = bytes(view[head:end])
+        self._rx_head = end
+        self._rx_tail = tail
         
-        if self.debug and data:
-            if sys.version_info[0] >= 3:
-                print(f"[DEBUG] Read data: {' '.join([f'{b:02X}' for b in data])}")
-            else:
-                print(f"[DEBUG] Read data: {' '.join([f'{b:02X}' for b in data])}")
+        if __debug__ and PortHandlerCAN.DEBUG_ANY and self._fmt is not None and data:
+            _debug_queue.put_nowait((self._fmt, 'Read data', data))
                 
         return data
 
+    def closePort(self):
+        """
+        Close the port and forget its file descriptor.
+        """
+        self._fd = None
+        super().closePort()
+
+    def getBytesAvailable(self):
+        """
+        Get the number of bytes that can be read without waiting.
+        
+        Returns:
+            int: Bytes held in the receive buffer plus bytes waiting in the serial port
+        """
+        return self._rx_tail - self._rx_head + self.ser.in_waiting
+
     def setupPort(self, cflag_baud):
         """
         Set up the port for communication.
@@ -145,10 +295,17 @@ class PortHandlerCAN(PortHandler):
 
             self.is_open = True
             self.ser.reset_input_buffer()
+            self._rx_head = self._rx_tail = 0
+            if os.name != 'nt':
+                self._fd = self.ser.fileno()
             self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
             
+            if not self._latency_timer_checked:
+                self._latency_timer_checked = True
+                self.checkLatencyTimer()
+            
             # Display configuration information in debug mode
-            if self.debug:
+            if __debug__ and self.debug:
                 print("[DEBUG] Port Configuration:")
                 print(f"  - Serial Port: {self.port_name}")
                 print(f"  - Serial Baudrate: {self.baudrate}")
@@ -162,34 +319,97 @@ class PortHandlerCAN(PortHandler):
             print(f"Error opening port: {e}")
             return False
 
+    def setLowLatency(self, enable=True):
+        """
+        Set the ASYNC_LOW_LATENCY flag of the serial port (Linux only).
+        
+        USB serial adapters such as FTDI chips otherwise hold received bytes
+        for their latency timer (16 ms by default) before passing them on,
+        which adds that delay to every status packet round-trip.
+        
+        Args:
+            enable (bool): True to enable low latency mode, False to disable
+            
+        Returns:
+            bool: True if the flag was updated, False if the port or driver does not support it
+        """
+        try:
+            self.ser.set_low_latency_mode(enable)
+        except (AttributeError, NotImplementedError, ValueError) as e:
+            # AttributeError: serial class without the method (Windows)
+            # NotImplementedError: POSIX platform other than Linux (macOS, BSD)
+            # ValueError: driver refused TIOCGSERIAL/TIOCSSERIAL
+            if __debug__ and self.debug:
+                print(f"[DEBUG] Low latency mode not available: {e}")
+            return False
+        return True
+
+    def checkLatencyTimer(self):
+        """
+        Check the latency timer of the USB serial adapter and lower it to 1 ms (Linux only).
+        
+        FTDI based adapters default to 16 ms, which is added to every status
+        packet round-trip. It is lowered through the sysfs attribute, or else
+        with setLowLatency, which needs no extra privileges on ftdi_sio. Only
+        if both fail does a warning show how to change it by hand. The
+        value is reset when the adapter is replugged, see README_CAN.md for a
+        udev rule that makes it permanent.
+        
+        Returns:
+            int: Latency timer in milliseconds, or None if the port has no latency timer
+        """
+        path = LATENCY_TIMER_PATH % os.path.basename(os.path.realpath(self.port_name))
+        try:
+            with open(path) as f:
+                latency = int(f.read())
+        except (OSError, ValueError):
+            # Not a USB serial adapter with a latency timer, or not Linux
+            return None
+
+        if latency > 1:
+            try:
+                with open(path, 'w') as f:
+                    f.write('1')
+                latency = 1
+            except OSError:
+                # ASYNC_LOW_LATENCY makes ftdi_sio set the latency timer to 1 ms
+                if self.setLowLatency():
+                    try:
+                        with open(path) as f:
+                            latency = int(f.read())
+                    except (OSError, ValueError):
+                        pass
+            if latency > 1:
+                print(f"Warning: latency timer of {self.port_name} is {latency} ms, every reply is delayed by up to that much")
+                print(f"  Set it to 1 ms with: setserial {self.port_name} low_latency")
+                print(f"  or: echo 1 | sudo tee {path}")
+        return latency
+
     def setDebug(self, enable):
         """
         Enable or disable debug mode.
         
+        Packet traces are formatted and printed by a background thread, so
+        they may appear slightly after other output of the caller.
+        
         Args:
             enable (bool): True to enable debug output, False to disable
         """
         self.debug = enable
+        self._fmt = _hex if enable else None
+        if enable:
+            _start_debug_printer()
+            PortHandlerCAN.DEBUG_ANY = True
     
     def printCANConfInstructions(self):
         """
         Print instructions for configuring the WS-TTL-CAN converter.
         """
-        print("=== WS-TTL-CAN Configuration Instructions ===")
-        print("1. Download and open WS-CAN-TOOL software from Waveshare's website")
-        print("2. Connect the WS-TTL-CAN converter to your computer via USB-to-TTL converter")
-        print("3. Configure the following settings:")
-        print("   - Set 'Working Mode' to 'Transparent Conversion'")
-        print(f"   - Set 'CAN Baudrate' to {self.can_baudrate} bps")
-        print(f"   - Set 'Serial Baudrate' to {self.baudrate} bps")
-        print("   - Set 'Serial Data Bit' to 8")
-        print("   - Set 'Serial Stop Bit' to 1")
-        print("   - Set 'Serial Parity Bit' to None")
-        print(f"   - Set 'CAN ID' to 0x{self.can_id:X}")
-        print(f"   - Set 'Frame Type' to {'Extended Frame' if self.extended_id else 'Standard Frame'}")
-        print("4. Click 'Save Device Parameters'")
-        print("5. Click 'Restart Device'")
-        print("===========================================")
+        print(_INSTR_TEMPLATE % (
+            self.can_baudrate,
+            self.baudrate,
+            self.can_id,
+            'Extended Frame' if self.extended_id else 'Standard Frame'))
 
 def PortHandlerForWaveshareCAN(port_name, can_id=DEFAULT_CAN_ID, extended_id=False, can_baudrate=1000000, debug=False):
     """
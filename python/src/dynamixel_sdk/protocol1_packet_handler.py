@@ -94,7 +94,6 @@ class Protocol1PacketHandler(object):
         return ""
 
     def txPacket(self, port, txpacket):
-        checksum = 0
         total_packet_length = txpacket[PKT_LENGTH] + 4  # 4: HEADER0 HEADER1 ID LENGTH
 
         if port.is_using:
@@ -111,8 +110,7 @@ class Protocol1PacketHandler(object):
         txpacket[PKT_HEADER1] = 0xFF
 
         # add a checksum to the packet
-        for idx in range(2, total_packet_length - 1):  # except header, checksum
-            checksum += txpacket[idx]
+        checksum = sum(txpacket[2:total_packet_length - 1])  # except header, checksum
 
         txpacket[total_packet_length - 1] = ~checksum & 0xFF
 
@@ -131,7 +129,6 @@ class Protocol1PacketHandler(object):
         rxpacket = []
 
         result = COMM_TX_FAIL
-        checksum = 0
         rx_length = 0
         wait_length = 6  # minimum length (HEADER0 HEADER1 ID LENGTH ERROR CHKSUM)
 
@@ -170,9 +167,7 @@ class Protocol1PacketHandler(object):
                             continue
 
                     # calculate checksum
-                    for i in range(2, wait_length - 1):  # except header, checksum
-                        checksum += rxpacket[i]
-                    checksum = ~checksum & 0xFF
+                    checksum = ~sum(rxpacket[2:wait_length - 1]) & 0xFF  # except header, checksum
 
                     # verify checksum
                     if rxpacket[wait_length - 1] == checksum:
@@ -497,7 +492,8 @@ class Protocol1PacketHandler(object):
 
         return result
 
-    def bulkReadTx(self, port, param, param_length):
+    def bulkReadTx(self, port, param, param_length, fast_option=False):
+        # fast_option is Protocol 2.0 only (Fast Bulk Read); accepted for GroupBulkRead compatibility
         txpacket = [0] * (param_length + 7)
         # 7: HEADER0 HEADER1 ID LEN INST 0x00 ... CHKSUM
 
@@ -75,7 +75,8 @@ USE_EXTENDED_ID         = False  # Use standard CAN frame (false) or extended CA
 DEBUG_MODE              = True   # Enable debug output
 
 def print_section(title):
-    print("\n" + "="*5 + f" {title} " + "="*5)
+    if __debug__:
+        print("\n" + "="*5 + f" {title} " + "="*5)
 
 def main():
     # Initialize PortHandler instance
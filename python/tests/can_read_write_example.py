@@ -36,17 +36,28 @@ if os.name == 'nt':
     import msvcrt
     def getch():
         return msvcrt.getch().decode()
+    kbhit = msvcrt.kbhit
+    read_key = getch
 else:
-    import sys, tty, termios
+    import sys, tty, termios, select
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
+    stdin_rd = [fd]
     def getch():
         try:
-            tty.setraw(sys.stdin.fileno())
+            # TCSADRAIN keeps a key press already detected by kbhit() (TCSAFLUSH would drop it)
+            tty.setraw(fd, termios.TCSADRAIN)
             ch = sys.stdin.read(1)
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
         return ch
+    def kbhit():
+        # Non-blocking check for a pending key press. The terminal has to be in
+        # cbreak mode, otherwise input is only reported after Enter.
+        return bool(select.select(stdin_rd, [], [], 0)[0])
+    def read_key():
+        # Read a key reported by kbhit() while already in cbreak mode
+        return sys.stdin.read(1)
 
 from dynamixel_sdk import *  # Uses Dynamixel SDK library
 
@@ -67,9 +78,15 @@ DEBUG_MODE              = True   # Enable debug output
 # Dynamixel addresses (may vary depending on your model)
 ADDR_MX_TORQUE_ENABLE       = 24
 ADDR_MX_GOAL_POSITION       = 30
+ADDR_MX_MOVING_SPEED        = 32
 ADDR_MX_PRESENT_POSITION    = 36
 ADDR_MX_MOVING              = 46
 
+# Data Byte Length
+LEN_MX_PRESENT_POSITION     = 2
+LEN_MX_MOVING               = 1
+LEN_MX_STATUS_BLOCK         = ADDR_MX_MOVING + LEN_MX_MOVING - ADDR_MX_PRESENT_POSITION  # Present position .. moving
+
 # Data value
 TORQUE_ENABLE               = 1     # Value for enabling the torque
 TORQUE_DISABLE              = 0     # Value for disabling the torque
@@ -77,14 +94,24 @@ DXL_MINIMUM_POSITION_VALUE  = 100   # Dynamixel will rotate between this value
 DXL_MAXIMUM_POSITION_VALUE  = 900   # and this value (note that the Dynamixel would not move when the position value is out of movable range)
 DXL_MOVING_STATUS_THRESHOLD = 20    # Dynamixel moving status threshold
 
+# Motion timing (MX series, joint mode)
+DXL_POSITION_UNITS_PER_REV  = 4096  # 0.088 degree per position unit
+DXL_SPEED_UNIT_RPM          = 0.114 # rpm per moving speed unit
+DXL_MAX_RPM                 = 55.0  # Used when moving speed is 0 (maximum speed, no speed control)
+DXL_MOVE_CONFIRM_RETRIES    = 3     # Moving status reads after the estimated travel time
+CYCLE_PAUSE_S               = 0.0   # Optional pause between moves in seconds (0: next move right away)
+
 def print_error(packet_handler, dxl_comm_result, dxl_error):
-    if dxl_comm_result != COMM_SUCCESS:
-        print("%s" % packet_handler.getTxRxResult(dxl_comm_result))
-    elif dxl_error != 0:
-        print("%s" % packet_handler.getRxPacketError(dxl_error))
+    # Diagnostic output only, compiled out when running with python -O
+    if __debug__:
+        if dxl_comm_result != COMM_SUCCESS:
+            print("%s" % packet_handler.getTxRxResult(dxl_comm_result))
+        elif dxl_error != 0:
+            print("%s" % packet_handler.getRxPacketError(dxl_error))
 
 def print_section(title):
-    print("\n" + "="*5 + f" {title} " + "="*5)
+    if __debug__:
+        print("\n" + "="*5 + f" {title} " + "="*5)
 
 def main():
     # Initialize PortHandler instance
@@ -137,6 +164,18 @@ def main():
     else:
         print("Dynamixel has been successfully connected and torque is enabled")
     
+    # Read the moving speed once to estimate how long each move takes
+    dxl_moving_speed, dxl_comm_result, dxl_error = packetHandler.read2ByteTxRx(
+        portHandler, DXL_ID, ADDR_MX_MOVING_SPEED
+    )
+    if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+        print("Failed to read moving speed, assuming maximum speed:")
+        print_error(packetHandler, dxl_comm_result, dxl_error)
+        dxl_moving_speed = 0
+    
+    dxl_rpm = dxl_moving_speed * DXL_SPEED_UNIT_RPM if dxl_moving_speed else DXL_MAX_RPM
+    ms_per_position_unit = 60000.0 / (dxl_rpm * DXL_POSITION_UNITS_PER_REV)
+    
     print("Press any key to continue with position control...")
     getch()
     
@@ -145,60 +184,80 @@ def main():
     print("Moving the Dynamixel between positions...")
     print("Press any key to stop...")
     
-    while True:
-        # Check if a key was pressed
-        if msvcrt.kbhit() if os.name == 'nt' else sys.stdin.isatty():
-            getch()
-            break
+    # Present position .. moving status, read together in one transaction
+    # instead of a separate read per register
+    dxl_status = None
+    
+    # Report key presses immediately instead of line by line. The terminal
+    # mode is switched once for the whole loop and restored once afterwards.
+    if os.name != 'nt':
+        tty.setcbreak(fd, termios.TCSADRAIN)
+    try:
+        while True:
+            # Check if a key was pressed (no terminal mode switch per iteration)
+            if kbhit():
+                read_key()
+                break
             
-        # Write goal position (alternate between minimum and maximum)
-        # Read current position first to determine which way to move
-        dxl_present_position, dxl_comm_result, dxl_error = packetHandler.read2ByteTxRx(
-            portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION
-        )
-        
-        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
-            print("Failed to read present position:")
-            print_error(packetHandler, dxl_comm_result, dxl_error)
-            continue
-        
-        # Determine target position based on current position
-        if dxl_present_position < (DXL_MINIMUM_POSITION_VALUE + DXL_MAXIMUM_POSITION_VALUE) / 2:
-            dxl_goal_position = DXL_MAXIMUM_POSITION_VALUE
-        else:
-            dxl_goal_position = DXL_MINIMUM_POSITION_VALUE
+            # Write goal position (alternate between minimum and maximum)
+            # Read current position first to determine which way to move
+            if dxl_status is None:
+                dxl_status, dxl_comm_result, dxl_error = packetHandler.readTxRx(
+                    portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION, LEN_MX_STATUS_BLOCK
+                )
+                if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+                    print("Failed to read present position:")
+                    print_error(packetHandler, dxl_comm_result, dxl_error)
+                    dxl_status = None
+                    continue
             
-        # Write the goal position
-        dxl_comm_result, dxl_error = packetHandler.write2ByteTxRx(
-            portHandler, DXL_ID, ADDR_MX_GOAL_POSITION, dxl_goal_position
-        )
-        
-        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
-            print("Failed to write goal position:")
-            print_error(packetHandler, dxl_comm_result, dxl_error)
-            continue
+            dxl_present_position = DXL_MAKEWORD(dxl_status[0], dxl_status[1])
+            dxl_status = None
             
-        print(f"Current Position: {dxl_present_position}  ->  Goal Position: {dxl_goal_position}")
-        
-        # Wait for the Dynamixel to reach the position
-        while True:
-            # Read moving status
-            dxl_moving, dxl_comm_result, dxl_error = packetHandler.read1ByteTxRx(
-                portHandler, DXL_ID, ADDR_MX_MOVING
+            # Determine target position based on current position
+            if dxl_present_position < (DXL_MINIMUM_POSITION_VALUE + DXL_MAXIMUM_POSITION_VALUE) / 2:
+                dxl_goal_position = DXL_MAXIMUM_POSITION_VALUE
+            else:
+                dxl_goal_position = DXL_MINIMUM_POSITION_VALUE
+            
+            # Write the goal position
+            dxl_comm_result, dxl_error = packetHandler.write2ByteTxRx(
+                portHandler, DXL_ID, ADDR_MX_GOAL_POSITION, dxl_goal_position
             )
             
             if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+                print("Failed to write goal position:")
                 print_error(packetHandler, dxl_comm_result, dxl_error)
-                break
+                continue
+            
+            print(f"Current Position: {dxl_present_position}  ->  Goal Position: {dxl_goal_position}")
+            
+            # Wait for the estimated travel time, then confirm the move with a single
+            # read of the moving status (and present position for the next move)
+            time.sleep(abs(dxl_goal_position - dxl_present_position) * ms_per_position_unit / 1000.0)
+            
+            for _ in range(DXL_MOVE_CONFIRM_RETRIES):
+                dxl_status, dxl_comm_result, dxl_error = packetHandler.readTxRx(
+                    portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION, LEN_MX_STATUS_BLOCK
+                )
                 
-            # Exit loop if Dynamixel is not moving
-            if dxl_moving == 0:
-                break
+                if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+                    print_error(packetHandler, dxl_comm_result, dxl_error)
+                    dxl_status = None
+                    break
                 
-            time.sleep(0.1)
+                # Done if Dynamixel is not moving
+                if dxl_status[ADDR_MX_MOVING - ADDR_MX_PRESENT_POSITION] == 0:
+                    break
+                
+                time.sleep(0.1)
             
-        # Sleep before attempting next move
-        time.sleep(1)
+            # Pause before the next move only if asked to
+            if CYCLE_PAUSE_S > 0:
+                time.sleep(CYCLE_PAUSE_S)
+    finally:
+        if os.name != 'nt':
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     
     # Disable Dynamixel Torque
     print_section("Cleanup")
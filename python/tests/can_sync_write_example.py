@@ -31,22 +31,34 @@
 
 import os
 import time
+import struct
 
 if os.name == 'nt':
     import msvcrt
     def getch():
         return msvcrt.getch().decode()
+    kbhit = msvcrt.kbhit
+    read_key = getch
 else:
-    import sys, tty, termios
+    import sys, tty, termios, select
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
+    stdin_rd = [fd]
     def getch():
         try:
-            tty.setraw(sys.stdin.fileno())
+            # TCSADRAIN keeps a key press already detected by kbhit() (TCSAFLUSH would drop it)
+            tty.setraw(fd, termios.TCSADRAIN)
             ch = sys.stdin.read(1)
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
         return ch
+    def kbhit():
+        # Non-blocking check for a pending key press. The terminal has to be in
+        # cbreak mode, otherwise input is only reported after Enter.
+        return bool(select.select(stdin_rd, [], [], 0)[0])
+    def read_key():
+        # Read a key reported by kbhit() while already in cbreak mode
+        return sys.stdin.read(1)
 
 from dynamixel_sdk import *  # Uses Dynamixel SDK library
 
@@ -64,28 +76,108 @@ USE_EXTENDED_ID         = False  # Use standard CAN frame (false) or extended CA
 DEBUG_MODE              = True   # Enable debug output
 
 # Define the IDs of the Dynamixels to control (modify as needed)
-DXL_ID_LIST             = [1, 2, 3]  # IDs for each Dynamixel
+DXL_ID_LIST             = (1, 2, 3)  # IDs for each Dynamixel
 
 # Dynamixel addresses (may vary depending on your model)
+ADDR_MX_MODEL_NUMBER        = 0
+ADDR_MX_RETURN_DELAY_TIME   = 5
+ADDR_MX_STATUS_RETURN_LEVEL = 16
 ADDR_MX_TORQUE_ENABLE       = 24
 ADDR_MX_GOAL_POSITION       = 30
 ADDR_MX_PRESENT_POSITION    = 36
 ADDR_MX_MOVING              = 46
 
+# Data byte length
+LEN_MX_MODEL_NUMBER         = 2
+LEN_MX_MOVING               = 1
+
 # Data value
 TORQUE_ENABLE               = 1     # Value for enabling the torque
 TORQUE_DISABLE              = 0     # Value for disabling the torque
 DXL_MINIMUM_POSITION_VALUE  = 100   # Dynamixel will rotate between this value
 DXL_MAXIMUM_POSITION_VALUE  = 900   # and this value
+STATUS_RETURN_LEVEL_READ    = 1     # Status packets for PING and READ instructions only
+STATUS_RETURN_LEVEL_ALL     = 2     # Status packets for all instructions (factory default)
+RETURN_DELAY_TIME_NONE      = 0     # Reply without the default 500 us return delay
+RETURN_DELAY_TIME_DEFAULT   = 250   # 500 us return delay (factory default)
+
+# Write status return level 1 and return delay time 0 at startup, and restore
+# the factory defaults on exit. WARNING: both live in the EEPROM area and are
+# kept after power off. If the program does not reach its cleanup, every TxRx
+# write to these servos (e.g. in can_read_write_example.py) waits for a status
+# packet that never comes and fails with COMM_RX_TIMEOUT until status return
+# level 2 is written back.
+CONFIGURE_STATUS_RETURN     = False
+
+# Motion completion polling
+MOVING_POLL_INTERVAL_S      = 0.02  # Pause between moving status reads
+MOVING_TIMEOUT_S            = 2.0   # Give up waiting for motion to complete after this
+
+# Goal position payloads (2 bytes, little endian), packed once
+PARAM_MAX                   = struct.pack('<H', DXL_MAXIMUM_POSITION_VALUE)
+PARAM_MIN                   = struct.pack('<H', DXL_MINIMUM_POSITION_VALUE)
 
 def print_error(packet_handler, dxl_comm_result, dxl_error=0):
-    if dxl_comm_result != COMM_SUCCESS:
-        print("%s" % packet_handler.getTxRxResult(dxl_comm_result))
-    elif dxl_error != 0:
-        print("%s" % packet_handler.getRxPacketError(dxl_error))
+    # Diagnostic output only, compiled out when running with python -O
+    if __debug__:
+        if dxl_comm_result != COMM_SUCCESS:
+            print("%s" % packet_handler.getTxRxResult(dxl_comm_result))
+        elif dxl_error != 0:
+            print("%s" % packet_handler.getRxPacketError(dxl_error))
+
+def restore_status_return(port_handler, packet_handler):
+    # Let write instructions answer with a status packet again (factory defaults)
+    packet_handler.write1ByteTxOnly(port_handler, BROADCAST_ID, ADDR_MX_STATUS_RETURN_LEVEL, STATUS_RETURN_LEVEL_ALL)
+    packet_handler.write1ByteTxOnly(port_handler, BROADCAST_ID, ADDR_MX_RETURN_DELAY_TIME, RETURN_DELAY_TIME_DEFAULT)
 
 def print_section(title):
-    print("\n" + "="*5 + f" {title} " + "="*5)
+    if __debug__:
+        print("\n" + "="*5 + f" {title} " + "="*5)
+
+def sync_position_loop(packet_handler, group_sync_write_max, group_sync_write_min, group_bulk_read_moving,
+                       kbhit=kbhit, read_key=read_key, monotonic=time.monotonic, sleep=time.sleep,
+                       ids=DXL_ID_LIST, comm_success=COMM_SUCCESS, verbose=DEBUG_MODE,
+                       timeout_s=MOVING_TIMEOUT_S, poll_interval_s=MOVING_POLL_INTERVAL_S,
+                       addr_moving=ADDR_MX_MOVING, len_moving=LEN_MX_MOVING):
+    # Move all Dynamixels back and forth until a key is pressed. The names used
+    # on every pass (key check, clock, sleep, IDs, result code, debug flag,
+    # polling settings and the moving register) are bound as default arguments,
+    # so they are fast local lookups instead of module global and attribute
+    # lookups. Names only needed for debug output or errors and builtins such
+    # as all() are still looked up globally.
+    toggle_position = True
+    while True:
+        # Check if key was pressed (non-blocking, no terminal mode switch per iteration)
+        if kbhit():
+            read_key()
+            break
+            
+        # Report the goal position only in debug mode, a print per cycle is a
+        # stdout write per cycle
+        if verbose:
+            target_position = DXL_MAXIMUM_POSITION_VALUE if toggle_position else DXL_MINIMUM_POSITION_VALUE
+            print(f"Moving all servos to position: {target_position}")
+        
+        # Syncwrite goal position (parameters prepared before the loop)
+        dxl_comm_result = (group_sync_write_max if toggle_position else group_sync_write_min).txPacket()
+        if dxl_comm_result != comm_success:
+            print("Failed to send sync write packet:")
+            print_error(packet_handler, dxl_comm_result)
+        
+        # Toggle position for next iteration
+        toggle_position = not toggle_position
+        
+        # Wait for all Dynamixels to complete their motion
+        deadline = monotonic() + timeout_s
+        while monotonic() < deadline:
+            sleep(poll_interval_s)
+            if group_bulk_read_moving.txRxPacket() != comm_success:
+                continue
+            if all(group_bulk_read_moving.getData(dxl_id, addr_moving, len_moving) == 0
+                   for dxl_id in ids):
+                break
+        else:
+            print(f"Motion not completed within {timeout_s} s")
 
 def main():
     # Initialize PortHandler instance
@@ -108,8 +200,28 @@ def main():
     # Initialize PacketHandler instance
     packetHandler = PacketHandler(PROTOCOL_VERSION)
     
-    # Initialize GroupSyncWrite instance
-    groupSyncWrite = GroupSyncWrite(portHandler, packetHandler, ADDR_MX_GOAL_POSITION, 2)
+    # Initialize GroupSyncWrite instances, one per target position. Only two goal
+    # positions are ever sent, so their parameters are built once here.
+    groupSyncWriteMax = GroupSyncWrite(portHandler, packetHandler, ADDR_MX_GOAL_POSITION, 2)
+    groupSyncWriteMin = GroupSyncWrite(portHandler, packetHandler, ADDR_MX_GOAL_POSITION, 2)
+    for dxl_id in DXL_ID_LIST:
+        # Add Dynamixel goal position values to the Syncwrite parameter storage
+        groupSyncWriteMax.addParam(dxl_id, PARAM_MAX)
+        groupSyncWriteMin.addParam(dxl_id, PARAM_MIN)
+    
+    # Initialize GroupSyncWrite instances for torque enable and disable, so
+    # switching torque for all Dynamixels is a single prepared instruction packet
+    groupSyncWriteTorqueOn = GroupSyncWrite(portHandler, packetHandler, ADDR_MX_TORQUE_ENABLE, 1)
+    groupSyncWriteTorqueOff = GroupSyncWrite(portHandler, packetHandler, ADDR_MX_TORQUE_ENABLE, 1)
+    for dxl_id in DXL_ID_LIST:
+        groupSyncWriteTorqueOn.addParam(dxl_id, bytes([TORQUE_ENABLE]))
+        groupSyncWriteTorqueOff.addParam(dxl_id, bytes([TORQUE_DISABLE]))
+    
+    # Initialize GroupBulkRead instance reading the moving status of every
+    # Dynamixel with a single instruction packet
+    groupBulkReadMoving = GroupBulkRead(portHandler, packetHandler)
+    for dxl_id in DXL_ID_LIST:
+        groupBulkReadMoving.addParam(dxl_id, ADDR_MX_MOVING, LEN_MX_MOVING)
     
     print_section("Port Setup")
     # Open port
@@ -130,36 +242,59 @@ def main():
         getch()
         return
     
-    # Enable torque for all Dynamixels
-    print_section("Torque Control")
-    for dxl_id in DXL_ID_LIST:
-        dxl_comm_result, dxl_error = packetHandler.write1ByteTxRx(
-            portHandler, dxl_id, ADDR_MX_TORQUE_ENABLE, TORQUE_ENABLE)
-        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
-            print(f"Failed to enable torque on Dynamixel ID {dxl_id}:")
-            print_error(packetHandler, dxl_comm_result, dxl_error)
-        else:
-            print(f"Dynamixel ID {dxl_id}: Torque enabled")
+    # Stop the USB serial adapter from holding replies for its latency timer
+    if portHandler.setLowLatency():
+        print("Succeeded to enable low latency mode")
+    else:
+        print("Low latency mode not available, replies may be delayed by the adapter's latency timer")
+    
+    # Stop write instructions from producing status packets and drop the
+    # reply delay, so setup and teardown occupy the bus for less time
+    if CONFIGURE_STATUS_RETURN:
+        print_section("Status Return")
+        packetHandler.write1ByteTxOnly(portHandler, BROADCAST_ID, ADDR_MX_STATUS_RETURN_LEVEL, STATUS_RETURN_LEVEL_READ)
+        packetHandler.write1ByteTxOnly(portHandler, BROADCAST_ID, ADDR_MX_RETURN_DELAY_TIME, RETURN_DELAY_TIME_NONE)
+        print("Status packets limited to PING and READ, return delay time set to 0")
     
     # Check if all Dynamixels can be pinged
     print_section("Checking Connections")
-    all_connected = True
+    # Protocol 1.0 has no broadcast ping, so the model number of every
+    # Dynamixel is requested with a single bulk read instead. GroupBulkRead
+    # drops the error byte of the status packets, so alarms such as overload
+    # or overheating are not reported on this path. IDs without valid data
+    # (model number 0), or all IDs when the bulk read fails, are pinged one by
+    # one, which does check the error byte.
+    missing_ids = []
+    groupBulkReadModel = GroupBulkRead(portHandler, packetHandler)
     for dxl_id in DXL_ID_LIST:
+        groupBulkReadModel.addParam(dxl_id, ADDR_MX_MODEL_NUMBER, LEN_MX_MODEL_NUMBER)
+    if groupBulkReadModel.txRxPacket() == COMM_SUCCESS:
+        ping_ids = []
+        for dxl_id in DXL_ID_LIST:
+            dxl_model_number = groupBulkReadModel.getData(dxl_id, ADDR_MX_MODEL_NUMBER, LEN_MX_MODEL_NUMBER)
+            if dxl_model_number:
+                print(f"Dynamixel ID {dxl_id}: Connected (Model: {dxl_model_number})")
+            else:
+                ping_ids.append(dxl_id)
+    else:
+        ping_ids = DXL_ID_LIST
+    for dxl_id in ping_ids:
         dxl_model_number, dxl_comm_result, dxl_error = packetHandler.ping(portHandler, dxl_id)
         if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
             print(f"Failed to ping Dynamixel ID {dxl_id}:")
             print_error(packetHandler, dxl_comm_result, dxl_error)
-            all_connected = False
+            missing_ids.append(dxl_id)
         else:
             print(f"Dynamixel ID {dxl_id}: Connected (Model: {dxl_model_number})")
     
-    if not all_connected:
-        print("Not all Dynamixels could be found. Check connections and IDs.")
+    if missing_ids:
+        print(f"Dynamixel IDs {missing_ids} could not be found. Check connections and IDs.")
         print("Press any key to terminate...")
         getch()
-        # Disable torque on all servos before exiting
-        for dxl_id in DXL_ID_LIST:
-            packetHandler.write1ByteTxRx(portHandler, dxl_id, ADDR_MX_TORQUE_ENABLE, TORQUE_DISABLE)
+        # Torque has not been enabled yet, disable it anyway in case a previous run left it on
+        groupSyncWriteTorqueOff.txPacket()
+        if CONFIGURE_STATUS_RETURN:
+            restore_status_return(portHandler, packetHandler)
         portHandler.closePort()
         return
     
@@ -167,60 +302,44 @@ def main():
     print("Press any key to continue with synchronized position control...")
     getch()
     
+    # Enable torque for all Dynamixels only once the connection check has
+    # passed, directly followed by the first goal position sync write
+    print_section("Torque Control")
+    dxl_comm_result = groupSyncWriteTorqueOn.txPacket()
+    if dxl_comm_result != COMM_SUCCESS:
+        print("Failed to send torque enable sync write packet:")
+        print_error(packetHandler, dxl_comm_result)
+    else:
+        print(f"Dynamixel IDs {DXL_ID_LIST}: Torque enabled")
+    
     # Start position control loop
     print_section("Sync Position Control")
     print("Moving all Dynamixels synchronously between positions...")
     print("Press any key to stop...")
     
-    toggle_position = True
-    
-    while True:
-        # Check if key was pressed
-        if msvcrt.kbhit() if os.name == 'nt' else sys.stdin.isatty():
-            getch()
-            break
-            
-        # Clear previous parameters
-        groupSyncWrite.clearParam()
-        
-        # Set goal position for all servos
-        target_position = DXL_MAXIMUM_POSITION_VALUE if toggle_position else DXL_MINIMUM_POSITION_VALUE
-        print(f"Moving all servos to position: {target_position}")
-        
-        # Add parameters for all Dynamixels
-        for dxl_id in DXL_ID_LIST:
-            # Allocate goal position value to send
-            param_goal_position = [DXL_LOBYTE(target_position), DXL_HIBYTE(target_position)]
-            
-            # Add Dynamixel goal position value to the Syncwrite parameter storage
-            dxl_addparam_result = groupSyncWrite.addParam(dxl_id, param_goal_position)
-            if not dxl_addparam_result:
-                print(f"Failed to add parameters for Dynamixel ID {dxl_id}")
-                break
-        
-        # Syncwrite goal position
-        dxl_comm_result = groupSyncWrite.txPacket()
-        if dxl_comm_result != COMM_SUCCESS:
-            print("Failed to send sync write packet:")
-            print_error(packetHandler, dxl_comm_result)
-        
-        # Toggle position for next iteration
-        toggle_position = not toggle_position
-        
-        # Wait for all Dynamixels to complete their motion
-        time.sleep(2)
+    # Report key presses immediately instead of line by line. The terminal
+    # mode is switched once for the whole loop and restored once afterwards.
+    if os.name != 'nt':
+        tty.setcbreak(fd, termios.TCSADRAIN)
+    try:
+        sync_position_loop(packetHandler, groupSyncWriteMax, groupSyncWriteMin, groupBulkReadMoving)
+    finally:
+        if os.name != 'nt':
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     
     # Disable torque on all servos
     print_section("Cleanup")
     print("Disabling torque on all Dynamixels...")
-    for dxl_id in DXL_ID_LIST:
-        dxl_comm_result, dxl_error = packetHandler.write1ByteTxRx(
-            portHandler, dxl_id, ADDR_MX_TORQUE_ENABLE, TORQUE_DISABLE)
-        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
-            print(f"Failed to disable torque on Dynamixel ID {dxl_id}:")
-            print_error(packetHandler, dxl_comm_result, dxl_error)
-        else:
-            print(f"Dynamixel ID {dxl_id}: Torque disabled")
+    dxl_comm_result = groupSyncWriteTorqueOff.txPacket()
+    if dxl_comm_result != COMM_SUCCESS:
+        print("Failed to send torque disable sync write packet:")
+        print_error(packetHandler, dxl_comm_result)
+    else:
+        print(f"Dynamixel IDs {DXL_ID_LIST}: Torque disabled")
+    
+    if CONFIGURE_STATUS_RETURN:
+        restore_status_return(portHandler, packetHandler)
+        print("Status return level and return delay time restored to factory defaults")
     
     # Close port
     portHandler.closePort()